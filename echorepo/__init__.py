@@ -1,17 +1,17 @@
 # echorepo/__init__.py
-import json
+import gzip
+import hashlib
 import logging
 import os
 import re
 import time
+from functools import lru_cache
 
 from flask import (
     Flask,
-    current_app,
+    Response,
     g,
     jsonify,
-    make_response,
-    render_template_string,
     request,
     session,
 )
@@ -19,17 +19,23 @@ from flask_babel import get_locale
 from flask_babel import gettext as _real_gettext
 from flask_babel import ngettext as _real_ngettext
 
-from .analytics import hash_ip, log_usage_event
-from .auth.routes import auth_bp, init_oauth
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .analytics import enqueue_usage_event, hash_ip
 from .config import settings
-from .i18n import BASE_LABEL_MSGIDS, init_i18n, lang_bp
-from .routes import data_api
-from .routes.api import api_bp
-from .routes.errors import errors_bp
-from .routes.i18n_admin import bp as i18n_admin_bp
-from .routes.web import web_bp
-from .services.db import init_db_sanity
-from .services.i18n_overrides import get_overrides, get_overrides_msgid
+from .i18n import LOCALE_FLAGS as _BASE_FLAGS
+from .i18n import init_i18n, lang_bp
+from .services.i18n_labels import _build_labels_cached, resolve_label_locale
+from .services.i18n_overrides import (
+    _canon_locale,
+    get_overrides,
+    get_overrides_msgid,
+    overrides_version,
+)
+from .utils.jsonfast import dumps_bytes
 
 # ---------- Logging ----------
 logger = logging.getLogger(__name__)
@@ -44,7 +50,62 @@ if not any(isinstance(h, logging.FileHandler) for h in logger.handlers):
     fh.setFormatter(fmt)
     logger.addHandler(fh)
 
+# ---------- App config resolved once at import ----------
+_CONFIG_DEFAULTS = {
+    "SESSION_COOKIE_SAMESITE": settings.SESSION_COOKIE_SAMESITE,
+    "SESSION_COOKIE_SECURE": settings.SESSION_COOKIE_SECURE,
+    # General settings
+    "LAT_COL": getattr(settings, "LAT_COL", "GPS_lat"),
+    "LON_COL": getattr(settings, "LON_COL", "GPS_long"),
+    "USER_KEY_COLUMN": getattr(settings, "USER_KEY_COLUMN", "email"),
+    "INPUT_CSV": getattr(settings, "INPUT_CSV", ""),
+    "SQLITE_PATH": getattr(settings, "SQLITE_PATH", ""),
+    "PLANNED_XLSX": getattr(settings, "PLANNED_XLSX", ""),
+    "ORIG_COL_SUFFIX": getattr(settings, "ORIG_COL_SUFFIX", "_orig"),
+    "HIDE_ORIG_COLS": getattr(settings, "HIDE_ORIG_COLS", True),
+    "MAX_JITTER_METERS": getattr(settings, "MAX_JITTER_METERS", 1000),
+    # Firebase / creds
+    "FIREBASE_PROJECT_ID": getattr(settings, "FIREBASE_PROJECT_ID", None),
+    "GOOGLE_APPLICATION_CREDENTIALS": getattr(settings, "GOOGLE_APPLICATION_CREDENTIALS", None),
+    # Overrides storage path
+    "I18N_OVERRIDES_PATH": os.environ.get("I18N_OVERRIDES_PATH", "/data/i18n_overrides.json"),
+    "LOCAL_STORAGE_DIR": os.environ.get("LOCAL_STORAGE_DIR", "/data/storage"),
+    # Expose allowlist path to current_app.config
+    "LAB_UPLOAD_ALLOWLIST_PATH": getattr(
+        settings,
+        "LAB_UPLOAD_ALLOWLIST_PATH",
+        "/data/config/lab_upload_lab_allowlist.csv",
+    ),
+}
+
+# ---------- Back-compat URLs: (view_func, endpoint, rule, methods) ----------
+_GET = frozenset({"GET"})
+# Werkzeug adds these to every GET rule
+_AUTO_METHODS = frozenset({"HEAD", "OPTIONS"})
+
+
+@lru_cache(maxsize=1)
+def _alias_map():
+    """
+    Extra rules for old /api/* URLs that no blueprint serves itself (api_bp
+    has no url_prefix). Aliases that merely duplicated a blueprint rule are
+    gone; templates use the dotted endpoints (web.home, ...) instead.
+
+    Holds the view callables themselves and imports them lazily, like
+    create_app() does for the blueprints; built once per process.
+    """
+    from .routes import api as api_views
+
+    return (
+        (api_views.user_geojson, "user_geojson", "/api/user_geojson", _GET),
+        (api_views.user_geojson_debug, "user_geojson_debug", "/api/user_geojson_debug", _GET),
+        (api_views.others_geojson, "others_geojson", "/api/others_geojson", _GET),
+    )
+
+
 # ---------- helpers ----------
+# email inside a stringified Keycloak profile: "{'email': '...'}"
+_KC_EMAIL_RE = re.compile(r"'email'\s*:\s*'([^']+)'")
 
 
 def _get_current_user_id():
@@ -71,7 +132,7 @@ def _get_current_user_id():
         # If it's a stringified dict (as it looks in the snapshot),
         # try to regex out the email: "{'email': '...'}"
         if isinstance(profile, str):
-            m = re.search(r"'email'\s*:\s*'([^']+)'", profile)
+            m = _KC_EMAIL_RE.search(profile)
             if m:
                 return m.group(1)
 
@@ -79,56 +140,132 @@ def _get_current_user_id():
     return None
 
 
-def _canon_locale(lang: str) -> str:
-    if not lang:
-        return "en"
-    lang = lang.strip().lower().replace("-", "_")
-    return lang.split("_", 1)[0]
+def _default_flags(codes):
+    # i18n.LOCALE_FLAGS is built once at import; unknown codes fall back to "gb"
+    return {**_BASE_FLAGS, **{c: "gb" for c in codes if c not in _BASE_FLAGS}}
+
 
+def _build_labels_for_locale(loc: str) -> dict:
+    """
+    Return the JS label dict for a locale.
+    Cached per (locale, overrides version); treat the result as read-only.
+    """
+    return _build_labels_cached(resolve_label_locale(loc), overrides_version())
 
-def _default_flags(codes):
-    base = {
-        "en": "gb",
-        "cs": "cz",
-        "de": "de",
-        "el": "gr",
-        "es": "es",
-        "fi": "fi",
-        "fr": "fr",
-        "it": "it",
-        "nl": "nl",
-        "pl": "pl",
-        "pt": "pt",
-        "ro": "ro",
-        "sk": "sk",
+
+@lru_cache(maxsize=64)
+def _labels_payload(loc: str, version: tuple, kind: str) -> tuple[bytes, str]:
+    """
+    Serialized /i18n/labels.{js,json} body and its ETag, cached like the labels.
+    """
+    labels = _build_labels_cached(loc, version)
+    if kind == "js":
+        body = b"window.I18N = " + dumps_bytes({"labels": labels}) + b";"
+    else:
+        body = dumps_bytes({"labels": labels, "locale": loc})
+    return body, hashlib.md5(body, usedforsecurity=False).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _labels_encoded(loc: str, version: tuple, kind: str, encoding: str) -> bytes:
+    body, _ = _labels_payload(loc, version, kind)
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _prime_labels(loc: str) -> None:
+    """Build labels, the labels.js body and its compressed variants for `loc`."""
+    loc = resolve_label_locale(loc)
+    version = overrides_version()
+    _labels_payload(loc, version, "json")
+    _labels_payload(loc, version, "js")
+    _labels_encoded(loc, version, "js", "gzip")
+    if brotli is not None:
+        _labels_encoded(loc, version, "js", "br")
+
+
+_CC_IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _labels_response(raw_locale: str, kind: str, mimetype: str) -> Response:
+    # ?locale= is user input: unsupported codes serve "en" and never become
+    # _labels_payload/_labels_encoded cache keys
+    loc = resolve_label_locale(raw_locale)
+    version = overrides_version()
+    body, etag = _labels_payload(loc, version, kind)
+
+    encoding = None
+    accept = request.accept_encodings
+    if brotli is not None and accept.quality("br") > 0:
+        encoding = "br"
+    elif accept.quality("gzip") > 0:
+        encoding = "gzip"
+    if encoding:
+        body = _labels_encoded(loc, version, kind, encoding)
+
+    headers = {
+        "Vary": "Accept-Encoding",
+        # A URL carrying the exact content hash (labels_js_version in templates)
+        # can be cached forever; otherwise revalidate and let the ETag give a 304
+        "Cache-Control": _CC_IMMUTABLE if request.args.get("v") == etag else "no-cache",
     }
-    out = dict(base)
-    for c in codes:
-        out.setdefault(c, "gb")
-    return out
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        etag = f"{etag}-{encoding}"
+    # cached bytes go straight into one Response; no make_response/header edits
+    resp = Response(body, mimetype=mimetype, headers=headers)
+    resp.set_etag(etag)
+    return resp.make_conditional(request)
 
 
-def _build_labels_for_locale(loc: str) -> dict:
+def _init_profiler(app: Flask) -> None:
     """
-    Build the JS label dict for the current locale.
-    Priority: key-override > msgid-override > gettext
+    Opt-in per-request profiler (ECHOREPO_PROFILE=1, dev only).
+    /__profile__ shows the pyinstrument report of the last profiled request.
     """
-    loc = _canon_locale(loc or "en")
-    by_msgid = get_overrides_msgid(loc) or {}
-    by_key = get_overrides(loc) or {}
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning("ECHOREPO_PROFILE is set but pyinstrument is not installed")
+        return
 
-    labels = {}
-    for key, msgid in BASE_LABEL_MSGIDS.items():
-        # prefer explicit key override for JS strings
-        text = by_key.get(key)
-        if text is None or text == "":
-            text = by_msgid.get(msgid) or _real_gettext(msgid)
-        labels[key] = text
-    return labels
+    last = {"html": None}
+
+    @app.before_request
+    def _prof_start():
+        if request.path != "/__profile__":
+            g._prof = Profiler()
+            g._prof.start()
+
+    @app.after_request
+    def _prof_stop(response):
+        prof = g.pop("_prof", None)
+        if prof is not None:
+            prof.stop()
+            last["html"] = prof.output_html()
+        return response
+
+    @app.get("/__profile__")
+    def profile_last():
+        if last["html"] is None:
+            return "No profiled request yet", 404
+        return Response(last["html"], mimetype="text/html")
 
 
 # ---------- create app ----------
 def create_app() -> Flask:
+    # Blueprints pull in pandas, psycopg2, minio, firebase, ...; importing them
+    # here keeps `import echorepo` cheap for CLI tools and forked workers.
+    from .auth.routes import auth_bp, init_oauth
+    from .routes import data_api
+    from .routes.api import api_bp
+    from .routes.errors import errors_bp
+    from .routes.i18n_admin import bp as i18n_admin_bp
+    from .routes.storage import storage_bp
+    from .routes.web import web_bp
+    from .services.db import init_db_sanity
+
     pkg_dir = os.path.dirname(__file__)
     app = Flask(
         __name__,
@@ -137,71 +274,136 @@ def create_app() -> Flask:
         static_url_path="/static",
     )
 
+    # Registered first so the profile covers every other hook
+    if os.environ.get("ECHOREPO_PROFILE"):
+        _init_profiler(app)
+
     # ---- Analytics configuration ----
     # Paths we consider "noise" (don't log them at all)
     ANALYTICS_EXCLUDED_PREFIXES = (
         "/static/",  # CSS, JS, images served as static files
         "/i18n/",  # labels.js / labels.json etc.
         "/debug/",  # debug helpers
+        "/storage/",  # images proxied from MinIO
         "/favicon.ico",
         "/robots.txt",
     )
 
     # Paths we consider *real* downloads (user-triggered data exports)
-    ESSENTIAL_DOWNLOAD_PATHS = (
-        "/download/canonical/all.zip",
-        "/download/canonical/samples.csv",
-        "/download/canonical/sample_images.csv",
-        "/download/canonical/sample_parameters.csv",
-        "/download/sample_csv",  # old alias
-        "/download/all_csv",  # old alias
+    ESSENTIAL_DOWNLOAD_PATHS = frozenset(
+        {
+            "/download/canonical/all.zip",
+            "/download/canonical/samples.csv",
+            "/download/canonical/sample_images.csv",
+            "/download/canonical/sample_parameters.csv",
+            "/download/sample_csv",  # old alias
+            "/download/all_csv",  # old alias
+        }
     )
 
-    # ---- Request timing logging, see /tmp/echorepo-slow.log ----
+    # ---- Request timing (slow log, see /tmp/echorepo-slow.log) + usage analytics ----
+    # One hook pair: registered first so the timer wraps every other hook.
     @app.before_request
     def _start_timer():
-        request._t0 = time.time()
+        g._t0 = time.time()
 
     @app.after_request
-    def _log_time(response):
-        t0 = getattr(request, "_t0", None)
-        if t0 is not None:
-            dt = (time.time() - t0) * 1000
-            if dt > 100:  # only log slow ones
-                current_app.logger.info("SLOW %s %s %.1f ms", request.method, request.path, dt)
-                logger.warning("SLOW %s %s %.1f ms", request.method, request.path, dt)
+    def _log_usage(response):
+        t0 = g.get("_t0")
+        dt = (time.time() - t0) * 1000 if t0 is not None else None
+        # only log slow ones, once, to the dedicated file logger
+        if dt is not None and dt > 100 and logger.isEnabledFor(logging.WARNING):
+            logger.warning("SLOW %s %s %.1f ms", request.method, request.path, dt)
+
+        try:
+            path = request.path
+
+            # ---- 1) Skip noisy / internal endpoints completely ----
+            # First, before any other analytics work; str.startswith takes
+            # the whole tuple and loops in C
+            if path.startswith(ANALYTICS_EXCLUDED_PREFIXES):
+                return response
+
+            duration_ms = int(dt) if dt is not None else None
+
+            # ---- 2) Identify user (resolved once per request by inject_current_user) ----
+            user = g.user if "user" in g else {"id": _get_current_user_id()}
+            user_id = user["id"] if user else None
+
+            # ---- 3) Collect other fields ----
+            ip = request.headers.get("X-Forwarded-For", request.remote_addr)
+            ip_h = hash_ip(ip)
+
+            ua = request.headers.get("User-Agent", "")
+            method = request.method
+            status = response.status_code
+            # header value only; calculate_content_length() would have to walk
+            # (and so buffer) streamed bodies such as CSV exports
+            bytes_sent = response.content_length or 0
+
+            extra = getattr(g, "_analytics_extra", {}) or {}
+            # ---- 4) Classify event type ----
+            if path in ESSENTIAL_DOWNLOAD_PATHS:
+                event_type = "download"
+                extra.setdefault("file", path)
+
+            elif path == "/search":
+                event_type = "search"
+
+            elif path.startswith("/lab-upload") or path.startswith("/lab-enrichment"):
+                # web: /lab-upload
+                # api: /api/v1/lab-enrichment
+                event_type = "upload"
+
+            elif path.startswith("/api/"):
+                event_type = "api_call"
+
+            else:
+                event_type = "page_view"
+
+            # ---- 5) Add generic extras per type ----
+
+            if event_type == "search":
+                # try to capture search query safely
+                q = request.args.get("q") or request.values.get("q")
+                if q:
+                    extra.setdefault("search_query", q[:200])  # avoid huge blobs
+
+            elif event_type == "upload":
+                # generic info; more detail can come from g._analytics_extra in the view
+                extra.setdefault("upload_path", path)
+                extra.setdefault("upload_method", method)
+
+            elif event_type == "api_call":
+                extra.setdefault("api_endpoint", path)
+                extra.setdefault("api_method", method)
+                # Optional: just log which query keys are used (not full values)
+                if request.args:
+                    extra.setdefault("api_query_keys", tuple(request.args.keys()))
+
+            enqueue_usage_event(
+                user_id=user_id,
+                event_type=event_type,
+                path=path,
+                method=method,
+                status_code=status,
+                bytes_sent=bytes_sent,
+                duration_ms=duration_ms,
+                ip_hash=ip_h,
+                user_agent=ua,
+                extra=extra,
+            )
+        except Exception as e:
+            # never break the user request because analytics failed
+            app.logger.warning("usage logging failed: %s", e)
+
         return response
 
     # Base config
     app.secret_key = settings.SECRET_KEY
     app.config.from_mapping(SECRET_KEY=os.environ.get("SECRET_KEY", "dev-secret"))
 
-    app.config.update(
-        SESSION_COOKIE_SAMESITE=settings.SESSION_COOKIE_SAMESITE,
-        SESSION_COOKIE_SECURE=settings.SESSION_COOKIE_SECURE,
-        # General settings
-        LAT_COL=getattr(settings, "LAT_COL", "GPS_lat"),
-        LON_COL=getattr(settings, "LON_COL", "GPS_long"),
-        USER_KEY_COLUMN=getattr(settings, "USER_KEY_COLUMN", "email"),
-        INPUT_CSV=getattr(settings, "INPUT_CSV", ""),
-        SQLITE_PATH=getattr(settings, "SQLITE_PATH", ""),
-        PLANNED_XLSX=getattr(settings, "PLANNED_XLSX", ""),
-        ORIG_COL_SUFFIX=getattr(settings, "ORIG_COL_SUFFIX", "_orig"),
-        HIDE_ORIG_COLS=getattr(settings, "HIDE_ORIG_COLS", True),
-        MAX_JITTER_METERS=getattr(settings, "MAX_JITTER_METERS", 1000),
-        # Firebase / creds
-        FIREBASE_PROJECT_ID=getattr(settings, "FIREBASE_PROJECT_ID", None),
-        GOOGLE_APPLICATION_CREDENTIALS=getattr(settings, "GOOGLE_APPLICATION_CREDENTIALS", None),
-        # Overrides storage path
-        I18N_OVERRIDES_PATH=os.environ.get("I18N_OVERRIDES_PATH", "/data/i18n_overrides.json"),
-        LOCAL_STORAGE_DIR=os.environ.get("LOCAL_STORAGE_DIR", "/data/storage"),
-        # Expose allowlist path to current_app.config
-        LAB_UPLOAD_ALLOWLIST_PATH=getattr(
-            settings,
-            "LAB_UPLOAD_ALLOWLIST_PATH",
-            "/data/config/lab_upload_lab_allowlist.csv",
-        ),
-    )
+    app.config.update(_CONFIG_DEFAULTS)
 
     # ---- i18n ----
     init_i18n(app)  # set up Babel, locale selection, etc.
@@ -218,12 +420,38 @@ def create_app() -> Flask:
     LOCALE_FLAGS = getattr(settings, "LOCALE_FLAGS", _default_flags(SUPPORTED_LOCALES))
 
     # ---- Override-aware gettext for templates (incl. {% trans %}) ----
-    def _gettext_with_overrides(msgid, **kwargs):
+    def _resolve_locale():
         try:
-            loc = _canon_locale(str(get_locale() or "en"))
+            return _canon_locale(str(get_locale() or "en"))
         except Exception:
-            loc = "en"
-        ov = get_overrides_msgid(loc).get(msgid)
+            return "en"
+
+    def _bind_request_i18n():
+        # Resolve locale + override maps once per request; gettext calls, the
+        # context processor and the /i18n/* endpoints all read them from g.
+        # Done lazily so JSON/static responses that never translate pay nothing.
+        g.loc = loc = _resolve_locale()
+        g.ov_msgid = get_overrides_msgid(loc)
+        g.ov_key = get_overrides(loc)
+
+    def _request_loc():
+        if "loc" not in g:
+            _bind_request_i18n()
+        return g.loc
+
+    def _msgid_overrides():
+        ov_map = g.get("ov_msgid")
+        if ov_map is None:
+            _bind_request_i18n()
+            ov_map = g.ov_msgid
+        return ov_map
+
+    def _gettext_with_overrides(msgid, **kwargs):
+        ov_map = _msgid_overrides()
+        if not ov_map:
+            # most locales have no overrides at all
+            return _real_gettext(msgid, **kwargs)
+        ov = ov_map.get(msgid)
         if ov not in (None, ""):
             try:
                 return ov % kwargs if kwargs else ov
@@ -232,12 +460,12 @@ def create_app() -> Flask:
         return _real_gettext(msgid, **kwargs)
 
     def _ngettext_with_overrides(singular, plural, n, **kwargs):
-        try:
-            loc = _canon_locale(str(get_locale() or "en"))
-        except Exception:
-            loc = "en"
-        ov = get_overrides_msgid(loc).get(singular)
-        if ov not in (None, ""):
+        ov_map = _msgid_overrides()
+        if not ov_map:
+            return _real_ngettext(singular, plural, n, **kwargs)
+        # one probe: the override for whichever form Babel would pick in English
+        ov = ov_map.get(singular if n == 1 else plural)
+        if ov:
             try:
                 return ov % kwargs if kwargs else ov
             except Exception:
@@ -252,36 +480,13 @@ def create_app() -> Flask:
             _ngettext_with_overrides,
             newstyle=True,
         )
-        # Also expose names that templates might use directly
+        # Newstyle callables return Markup under autoescape, which would let
+        # msgid overrides (or probe input) through unescaped. Templates call
+        # these plain-str versions, so autoescape still applies to the result.
         app.jinja_env.globals["_"] = _gettext_with_overrides
         app.jinja_env.globals["gettext"] = _gettext_with_overrides
         app.jinja_env.globals["ngettext"] = _ngettext_with_overrides
 
-    # Install once now…
-    _install_callables()
-
-    # …and also re-install on every request in case something rebinds them later.
-    @app.before_request
-    def _force_i18n_install_every_time():
-        _install_callables()
-
-    # Make Jinja use our override-aware functions everywhere
-    app.jinja_env.install_gettext_callables(
-        _gettext_with_overrides,
-        _ngettext_with_overrides,
-        newstyle=True,  # enables %(name)s formatting
-    )
-
-    app.jinja_env.globals["_"] = _gettext_with_overrides
-
-    # ✅ Ensure our binding persists *after* Babel hooks per-request
-    @app.before_request
-    def _rebind_gettext_per_request():
-        app.jinja_env.install_gettext_callables(
-            _gettext_with_overrides, _ngettext_with_overrides, newstyle=True
-        )
-        app.jinja_env.globals["_"] = _gettext_with_overrides
-
     @app.before_request
     def inject_current_user():
         """
@@ -298,227 +503,94 @@ def create_app() -> Flask:
             g.user = None
 
     # ---- Inject JS labels + locale into templates (for pages that need it) ----
-    @app.context_processor
-    def inject_i18n_and_locale():
-        try:
-            loc = _canon_locale(str(get_locale() or "en"))
-        except Exception:
-            loc = "en"
-
-        # Build JS labels with both override layers
-        labels = {}
-        by_msgid = get_overrides_msgid(loc)  # {msgid: value}
-        by_key = get_overrides(loc)  # {key: value}
-        for key, msgid in BASE_LABEL_MSGIDS.items():
-            base = by_msgid.get(msgid) or _real_gettext(msgid)
-            labels[key] = by_key.get(key, base)
-
-        # ⬇️ ADD THESE THREE KEYS to override Babel's context-level bindings
+    @lru_cache(maxsize=32)
+    def _template_context(loc, version):
+        # Built once per (locale, overrides version); Flask only reads it
         return {
-            "I18N": {"labels": labels},
+            "I18N": {"labels": _build_labels_cached(loc, version)},
+            # content hash for the labels.js URL, so browsers can cache it
+            "labels_js_version": _labels_payload(loc, version, "js")[1],
             "current_locale": loc,
             "SUPPORTED_LOCALES": SUPPORTED_LOCALES,
             "LOCALE_FLAGS": LOCALE_FLAGS,
-            "_": _gettext_with_overrides,  # <—
-            "gettext": _gettext_with_overrides,  # <—
-            "ngettext": _ngettext_with_overrides,  # <—
         }
 
+    @app.context_processor
+    def inject_i18n_and_locale():
+        return _template_context(_request_loc(), overrides_version())
+
     # ---- OAuth / Blueprints ----
     init_oauth(app)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(i18n_admin_bp)  # /i18n/admin
-    app.register_blueprint(web_bp)
-    app.register_blueprint(api_bp)
-    app.register_blueprint(errors_bp)
-    app.register_blueprint(data_api.data_api, url_prefix="/api/v1")  # or url_prefix="/api"
-    from echorepo.routes.storage import storage_bp
-
-    app.register_blueprint(storage_bp)  # ← add this
-
-    # ---- Back-compat endpoint aliases ----
-    alias_map = [
-        # web
-        ("home", "web.home", "/", ["GET"]),
-        ("download_csv", "web.download_csv", "/download/csv", ["POST"]),
-        ("download_xlsx", "web.download_xlsx", "/download/xlsx", ["POST"]),
-        ("download_all_csv", "web.download_all_csv", "/download/all_csv", ["GET"]),
-        # api
-        ("user_geojson", "api.user_geojson", "/api/user_geojson", ["GET"]),
-        ("user_geojson_debug", "api.user_geojson_debug", "/api/user_geojson_debug", ["GET"]),
-        ("others_geojson", "api.others_geojson", "/api/others_geojson", ["GET"]),
-        ("download_sample_csv", "api.download_sample_csv", "/download/sample_csv", ["GET"]),
-        # auth
-        ("login", "auth.login", "/login", ["GET"]),
-        ("sso_password_login", "auth.sso_password_login", "/login", ["POST"]),
-        ("logout", "auth.logout", "/logout", ["GET"]),
-        ("sso_callback", "auth.sso_callback", "/sso/callback", ["GET"]),
-    ]
-    for ep, target, rule, methods in alias_map:
-        app.add_url_rule(
-            rule,
-            endpoint=ep,
-            view_func=app.view_functions[target],
-            methods=methods,
-        )
+    for bp, url_prefix in (
+        (auth_bp, None),
+        (i18n_admin_bp, None),  # /i18n/admin
+        (web_bp, None),
+        (api_bp, None),
+        (errors_bp, None),
+        (data_api.data_api, "/api/v1"),  # or url_prefix="/api"
+        (storage_bp, None),
+    ):
+        app.register_blueprint(bp, url_prefix=url_prefix)
+
+    # ---- Back-compat /api/* URLs ----
+    # only add rules the blueprints do not already serve
+    existing = {(r.rule, frozenset(r.methods or ())) for r in app.url_map.iter_rules()}
+    for view_func, ep, rule, methods in _alias_map():
+        if (rule, methods | _AUTO_METHODS) not in existing:
+            app.add_url_rule(rule, endpoint=ep, view_func=view_func, methods=methods)
+
+    # Install once, after Babel and every blueprint are set up so nothing
+    # registered later can rebind them; there is no per-request rebinding.
+    _install_callables()
 
     # ---- DB sanity ----
     with app.app_context():
         init_db_sanity()
+        # Precompute JS labels (+ compressed labels.js) for every locale so
+        # first renders hit the cache
+        for loc in SUPPORTED_LOCALES:
+            _prime_labels(loc)
 
     # ---- i18n JSON/JS endpoints for the frontend ----
     @app.get("/i18n/labels.json")
     def i18n_labels_json():
-        try:
-            raw = str(get_locale() or "en")
-        except Exception:
-            raw = "en"
-        labels = _build_labels_for_locale(raw)
-        resp = jsonify({"labels": labels, "locale": _canon_locale(raw)})
-        resp.headers["Cache-Control"] = "no-store"
-        return resp
+        return _labels_response(_request_loc(), "json", "application/json")
 
     @app.get("/i18n/probe-json")
     def i18n_probe_json():
         s = request.args.get("s", "About")
-        loc = _canon_locale(str(get_locale() or "en"))
+        loc = _request_loc()
         return jsonify(
             {
                 "locale": loc,
-                "override": get_overrides_msgid(loc).get(s),
+                "override": g.ov_msgid.get(s),
                 "gettext_with_overrides": _gettext_with_overrides(s),
                 "babel_gettext": _real_gettext(s),
             }
         )
 
+    # Compiled once; the probe string is passed as data, never as template source
+    probe_tpl = app.jinja_env.from_string("{{ _(s) }}")
+
     @app.get("/i18n/probe-tpl")
     def i18n_probe_tpl():
         s = request.args.get("s", "About")
         # Render via Jinja so we test what templates *actually* call.
-        out = render_template_string("{{ _('" + s.replace('"', '\\"') + "') }}")
-        return out
+        return probe_tpl.render(s=s)
 
     @app.get("/i18n/labels.js")
     def i18n_labels_js():
-        try:
-            raw = str(get_locale() or "en")
-        except Exception:
-            raw = "en"
-        labels = _build_labels_for_locale(raw)
-        payload = "window.I18N = " + json.dumps({"labels": labels}, ensure_ascii=False) + ";"
-        resp = make_response(payload, 200)
-        resp.headers["Content-Type"] = "application/javascript; charset=utf-8"
-        resp.headers["Cache-Control"] = "no-store"
-        return resp
+        raw = request.args.get("locale") or _request_loc()
+        return _labels_response(raw, "js", "application/javascript")
 
     # ---- No-cache for HTML ----
     @app.after_request
     def nocache_html(resp):
-        if resp.mimetype == "text/html":
+        # plain prefix check; resp.mimetype re-parses Content-Type params
+        if resp.headers.get("Content-Type", "").startswith("text/html"):
             resp.headers["Cache-Control"] = "no-store"
         return resp
 
-    @app.before_request
-    def _start_timer():
-        g._start_time = time.time()
-
-    @app.after_request
-    def _log_usage(response):
-        try:
-            start = getattr(g, "_start_time", None)
-            duration_ms = int((time.time() - start) * 1000) if start is not None else None
-
-            path = request.path
-
-            # ---- 1) Skip noisy / internal endpoints completely ----
-            if any(path.startswith(p) for p in ANALYTICS_EXCLUDED_PREFIXES):
-                return response
-
-            # If you also want to skip *all* /storage/* (images proxied from MinIO),
-            # uncomment this:
-            if path.startswith("/storage/"):
-                return response
-            # --------------------------------------------------------
-
-            # ---- 2) Identify user ----
-            user_id = _get_current_user_id()
-
-            # ---- 3) Classify event type (only "essential" ones) ----
-            if path in ESSENTIAL_DOWNLOAD_PATHS:
-                event_type = "download"
-            elif path.startswith("/api/"):
-                event_type = "api_call"
-            else:
-                # Treat everything else as a "page view" (HTML pages)
-                event_type = "page_view"
-
-            # ---- 4) Collect other fields ----
-            ip = request.headers.get("X-Forwarded-For", request.remote_addr)
-            ip_h = hash_ip(ip)
-
-            ua = request.headers.get("User-Agent", "")
-            method = request.method
-            status = response.status_code
-            bytes_sent = response.calculate_content_length() or 0
-
-            extra = getattr(g, "_analytics_extra", {}) or {}
-            # ---- 1) classify event_type ----
-            if path in ESSENTIAL_DOWNLOAD_PATHS:
-                event_type = "download"
-                extra.setdefault("file", path)
-
-            elif path == "/search":
-                event_type = "search"
-
-            elif path.startswith("/lab-upload") or path.startswith("/lab-enrichment"):
-                # web: /lab-upload
-                # api: /api/v1/lab-enrichment
-                event_type = "upload"
-
-            elif path.startswith("/api/"):
-                event_type = "api_call"
-
-            else:
-                event_type = "page_view"
-
-            # ---- 2) add generic extras per type ----
-
-            if event_type == "search":
-                # try to capture search query safely
-                q = request.args.get("q") or request.values.get("q")
-                if q:
-                    extra.setdefault("search_query", q[:200])  # avoid huge blobs
-
-            elif event_type == "upload":
-                # generic info; more detail can come from g._analytics_extra in the view
-                extra.setdefault("upload_path", path)
-                extra.setdefault("upload_method", method)
-
-            elif event_type == "api_call":
-                extra.setdefault("api_endpoint", path)
-                extra.setdefault("api_method", method)
-                # Optional: just log which query keys are used (not full values)
-                if request.args:
-                    extra.setdefault("api_query_keys", sorted(request.args.keys()))
-
-            log_usage_event(
-                user_id=user_id,
-                event_type=event_type,
-                path=path,
-                method=method,
-                status_code=status,
-                bytes_sent=bytes_sent,
-                duration_ms=duration_ms,
-                ip_hash=ip_h,
-                user_agent=ua,
-                extra=extra,
-            )
-        except Exception as e:
-            # never break the user request because analytics failed
-            app.logger.warning("usage logging failed: %s", e)
-
-        return response
-
     # ----- Debug routes --------------------------------------------
     @app.get("/debug/whoami")
     def debug_whoami():
@@ -561,7 +633,7 @@ def create_app() -> Flask:
             loc_raw = str(get_locale() or "en")
         except Exception:
             loc_raw = "en"
-        loc = _canon_locale(loc_raw)
+        loc = _request_loc()
         labels = _build_labels_for_locale(loc)
         return jsonify(
             {
@@ -576,12 +648,12 @@ def create_app() -> Flask:
 
     @app.get("/i18n/check-overrides")
     def i18n_check_overrides():
-        loc = _canon_locale(str(get_locale() or "en"))
+        loc = _request_loc()
         return jsonify(
             {
                 "locale": loc,
-                "by_key": get_overrides(loc),
-                "by_msgid": get_overrides_msgid(loc),
+                "by_key": g.ov_key,
+                "by_msgid": g.ov_msgid,
             }
         )
 
@@ -1,10 +1,17 @@
 # echorepo/analytics.py
+import csv
 import hashlib
+import io
+import logging
 import os
+import queue
+import threading
+import time
 from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
 
-import psycopg2
-from psycopg2.extras import Json
+from .utils.jsonfast import dumps_bytes
 
 DB_HOST = os.getenv("DB_HOST_INSIDE", "echorepo-postgres")
 DB_PORT = int(os.getenv("DB_PORT_INSIDE", "5432"))
@@ -13,32 +20,81 @@ DB_USER = os.getenv("DB_USER", "echorepo")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "echorepo-pass")
 
 ANALYTICS_SALT = os.getenv("ANALYTICS_SALT", "change-me-analytics-salt-3210@echo-repo")
+_PRESALTED = hashlib.sha256(ANALYTICS_SALT.encode("utf-8"))
+
+log = logging.getLogger(__name__)
+
+# Background writer: requests enqueue events, one daemon thread per process
+# drains them in batches so the response never waits on Postgres.
+_EVENT_Q: queue.Queue = queue.Queue(maxsize=10000)
+_BATCH_SIZE = 100
+_FLUSH_INTERVAL = 1.0  # seconds
+_DRAINER_LOCK = threading.Lock()
+_DRAINER_PID = [None]  # pid that owns the running drainer (gunicorn forks)
+_DROPPED = [0]  # events discarded because the queue was full
+
+# Batches go in through COPY (no per-row parse/plan). ts is filled in when the
+# event is created, so a queued event keeps its request time.
+_COPY_SQL = (
+    "COPY usage_events (ts, user_id, event_type, path, method, status_code,"
+    " bytes_sent, duration_ms, ip_hash, user_agent, extra)"
+    " FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+)
+_CSV_NULL = "\\N"
+
+# Connection pool, created on first use in each process (never shared across
+# a fork): the drainer and any direct log_usage_event() callers reuse
+# connections instead of paying TCP + auth per write.
+_POOL_LOCK = threading.Lock()
+_POOL = {"pid": None, "pool": None}
+
+
+def _get_pool():
+    pid = os.getpid()
+    if _POOL["pid"] != pid:
+        with _POOL_LOCK:
+            if _POOL["pid"] != pid:
+                from psycopg2.pool import ThreadedConnectionPool
+
+                _POOL["pool"] = ThreadedConnectionPool(
+                    1,
+                    4,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD,
+                )
+                _POOL["pid"] = pid
+    return _POOL["pool"]
 
 
 @contextmanager
 def _get_conn():
-    conn = psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
+    pool = _get_pool()
+    conn = pool.getconn()
     try:
         yield conn
-    finally:
-        conn.close()
+    except Exception:
+        # the connection may be broken or mid-transaction; don't hand it back
+        pool.putconn(conn, close=True)
+        raise
+    else:
+        pool.putconn(conn)
 
 
+# The salt is fixed for the process, so a client's hash never changes;
+# chatty clients (the common case) hit the cache instead of SHA-256.
+@lru_cache(maxsize=4096)
 def hash_ip(ip: str | None) -> str | None:
     if not ip:
         return None
-    h = hashlib.sha256()
-    h.update((ANALYTICS_SALT + ip).encode("utf-8"))
+    h = _PRESALTED.copy()  # salt already absorbed; only the IP is hashed
+    h.update(ip.encode("utf-8"))
     return h.hexdigest()
 
 
-def log_usage_event(
+def _event_row(
     *,
     ts=None,
     user_id=None,
@@ -52,33 +108,116 @@ def log_usage_event(
     user_agent=None,
     extra=None,
 ):
-    extra = extra or {}
+    return (
+        ts or datetime.now(timezone.utc),
+        user_id,
+        event_type,
+        path,
+        method,
+        status_code,
+        bytes_sent,
+        duration_ms,
+        ip_hash,
+        user_agent,
+        dumps_bytes(extra or {}).decode("utf-8"),
+    )
+
+
+def _write_rows(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_CSV_NULL if v is None else v for v in row])
+    buf.seek(0)
 
     with _get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO usage_events
-              (ts, user_id, event_type, path, method,
-               status_code, bytes_sent, duration_ms,
-               ip_hash, user_agent, extra)
-            VALUES
-              (COALESCE(%s, now()), %s, %s, %s, %s,
-               %s, %s, %s,
-               %s, %s, %s)
-            """,
-            (
-                ts,
-                user_id,
-                event_type,
-                path,
-                method,
-                status_code,
-                bytes_sent,
-                duration_ms,
-                ip_hash,
-                user_agent,
-                Json(extra),
-            ),
-        )
+        with conn.cursor() as cur:
+            cur.copy_expert(_COPY_SQL, buf)
         conn.commit()
+
+
+def log_usage_event(
+    *,
+    ts=None,
+    user_id=None,
+    event_type="page_view",
+    path="/",
+    method="GET",
+    status_code=200,
+    bytes_sent=None,
+    duration_ms=None,
+    ip_hash=None,
+    user_agent=None,
+    extra=None,
+):
+    """Insert one usage event synchronously (see enqueue_usage_event)."""
+    row = _event_row(
+        ts=ts,
+        user_id=user_id,
+        event_type=event_type,
+        path=path,
+        method=method,
+        status_code=status_code,
+        bytes_sent=bytes_sent,
+        duration_ms=duration_ms,
+        ip_hash=ip_hash,
+        user_agent=user_agent,
+        extra=extra,
+    )
+    _write_rows([row])
+
+
+def _drain_events():
+    while True:
+        batch = [_EVENT_Q.get()]
+        deadline = time.monotonic() + _FLUSH_INTERVAL
+        while len(batch) < _BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_EVENT_Q.get(timeout=timeout))
+            except queue.Empty:
+                break
+        # build rows one by one: a bad event (unexpected keyword, extra that
+        # won't serialize) is skipped instead of losing the whole batch
+        rows = []
+        for ev in batch:
+            try:
+                rows.append(_event_row(**ev))
+            except Exception as e:
+                log.warning("skipping usage event %r: %s", ev.get("path"), e)
+        if not rows:
+            continue
+        try:
+            _write_rows(rows)
+        except Exception as e:
+            log.warning("usage event batch (%d) failed: %s", len(batch), e)
+
+
+def _ensure_drainer():
+    pid = os.getpid()
+    if _DRAINER_PID[0] == pid:
+        return
+    with _DRAINER_LOCK:
+        if _DRAINER_PID[0] != pid:
+            threading.Thread(target=_drain_events, name="usage-events", daemon=True).start()
+            _DRAINER_PID[0] = pid
+
+
+def enqueue_usage_event(**event):
+    """
+    Hand a usage event to the background writer; never blocks the request.
+    Same keyword arguments as log_usage_event. Events are dropped when the
+    queue is full; _DROPPED counts them and a warning is logged at each
+    power of two.
+    """
+    _ensure_drainer()
+    event.setdefault("ts", datetime.now(timezone.utc))
+    try:
+        _EVENT_Q.put_nowait(event)
+    except queue.Full:
+        _DROPPED[0] += 1
+        n = _DROPPED[0]
+        if n & (n - 1) == 0:  # 1, 2, 4, 8, ...
+            log.warning("usage event queue full; %d events dropped so far", n)
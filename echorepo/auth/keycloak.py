@@ -1,18 +1,31 @@
+import requests
+from requests.adapters import HTTPAdapter
+
 from ..config import settings
 
+# KC 12 uses /auth prefix; modern KC doesn't. Resolved once at import.
+_KC_ROOT = f"{settings.KC_BASE}/auth" if settings.KC_USE_AUTH_PREFIX else settings.KC_BASE
+
 
 def kc_url(path: str) -> str:
-    """KC 12 uses /auth prefix; modern KC doesn't."""
-    return (
-        f"{settings.KC_BASE}/auth{path}"
-        if settings.KC_USE_AUTH_PREFIX
-        else f"{settings.KC_BASE}{path}"
-    )
-
-
-KC_ISSUER = kc_url(f"/realms/{settings.KC_REALM}")
-KC_WELLKNOWN = kc_url(f"/realms/{settings.KC_REALM}/.well-known/openid-configuration")
-KC_TOKEN = kc_url(f"/realms/{settings.KC_REALM}/protocol/openid-connect/token")
-KC_USERINFO = kc_url(f"/realms/{settings.KC_REALM}/protocol/openid-connect/userinfo")
-KC_LOGOUT = kc_url(f"/realms/{settings.KC_REALM}/protocol/openid-connect/logout")
-KC_INTROSPECT = kc_url(f"/realms/{settings.KC_REALM}/protocol/openid-connect/token/introspect")
+    return _KC_ROOT + path
+
+
+_REALM_ROOT = f"{_KC_ROOT}/realms/{settings.KC_REALM}"
+_OIDC = _REALM_ROOT + "/protocol/openid-connect"
+
+KC_ISSUER = _REALM_ROOT
+KC_WELLKNOWN = _REALM_ROOT + "/.well-known/openid-configuration"
+KC_TOKEN = _OIDC + "/token"
+KC_USERINFO = _OIDC + "/userinfo"
+KC_LOGOUT = _OIDC + "/logout"
+KC_INTROSPECT = _OIDC + "/token/introspect"
+
+# Constant part of every token/logout form body
+KC_CLIENT_CRED = {"client_id": settings.KC_CLIENT_ID, "client_secret": settings.KC_CLIENT_SECRET}
+
+# One pooled HTTP session per process for all Keycloak calls, so token
+# refreshes, userinfo and logout reuse kept-alive (TLS) connections.
+KC_HTTP = requests.Session()
+for _scheme in ("https://", "http://"):
+    KC_HTTP.mount(_scheme, HTTPAdapter(pool_connections=4, pool_maxsize=16))
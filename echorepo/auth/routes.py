@@ -6,7 +6,15 @@ from flask import Blueprint, jsonify, redirect, render_template, request, sessio
 from ..config import settings
 from ..extensions import oauth
 from ..services.firebase import send_password_reset_email
-from .keycloak import KC_ISSUER, KC_LOGOUT, KC_TOKEN, KC_USERINFO, KC_WELLKNOWN
+from .keycloak import (
+    KC_CLIENT_CRED,
+    KC_HTTP,
+    KC_ISSUER,
+    KC_LOGOUT,
+    KC_TOKEN,
+    KC_USERINFO,
+    KC_WELLKNOWN,
+)
 from .tokens import before_request_refresh, create_session_from_tokens
 
 
@@ -196,16 +204,15 @@ def sso_password_login():
         )
 
     data = {
+        **KC_CLIENT_CRED,
         "grant_type": "password",
-        "client_id": settings.KC_CLIENT_ID,
-        "client_secret": settings.KC_CLIENT_SECRET,
         "username": username,
         "password": password,
         "scope": "openid email profile",
     }
 
     try:
-        response = requests.post(
+        response = KC_HTTP.post(
             KC_TOKEN,
             data=data,
             timeout=15,
@@ -325,15 +332,10 @@ def logout():
 
     if kc:
         try:
-            requests.post(
+            KC_HTTP.post(
                 KC_LOGOUT,
                 data={
-                    "client_id":
-                        settings.KC_CLIENT_ID,
-
-                    "client_secret":
-                        settings.KC_CLIENT_SECRET,
-
+                    **KC_CLIENT_CRED,
                     "refresh_token":
                         kc.get(
                             "refresh_token",
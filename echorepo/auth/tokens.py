@@ -1,23 +1,32 @@
 import base64
-import json
 import time
+from functools import lru_cache
+from types import MappingProxyType
 
-import requests
 from flask import request, session
 
-from ..config import settings
-from .keycloak import KC_TOKEN, KC_USERINFO
+from ..utils.jsonfast import loads
+from .keycloak import KC_CLIENT_CRED, KC_HTTP, KC_TOKEN, KC_USERINFO
 
+_EMPTY_CLAIMS = MappingProxyType({})
 
-def _jwt_payload_unverified(token: str) -> dict:
+
+@lru_cache(maxsize=512)
+def _jwt_payload_unverified(token: str) -> MappingProxyType:
+    """
+    Claims of a JWT without signature checks (tokens come straight from our IdP).
+    Tokens are immutable strings, so the decode is cached; the result is read-only.
+    """
     try:
         parts = token.split(".")
         if len(parts) != 3:
-            return {}
-        payload_b64 = parts[1] + "=" * (-len(parts[1]) % 4)
-        return json.loads(base64.urlsafe_b64decode(payload_b64).decode("utf-8"))
+            return _EMPTY_CLAIMS
+        payload = parts[1].encode("ascii")
+        # re-pad to a multiple of 4 by slicing one constant
+        payload += b"===="[: -len(payload) & 3]
+        return MappingProxyType(loads(base64.urlsafe_b64decode(payload)))
     except Exception:
-        return {}
+        return _EMPTY_CLAIMS
 
 
 def create_session_from_tokens(tok_json: dict):
@@ -26,32 +35,43 @@ def create_session_from_tokens(tok_json: dict):
     if not access_token or not refresh_token:
         raise ValueError("Missing tokens from IdP")
 
+    # The access token normally carries the identity claims already; only ask
+    # the userinfo endpoint (one more round trip) when they are missing.
+    # email is required too: session["user"] is keyed by it when present.
+    p = _jwt_payload_unverified(access_token)
+    claims_profile = {
+        "sub": p.get("sub"),
+        "email": p.get("email"),
+        "preferred_username": p.get("preferred_username"),
+        "username": p.get("preferred_username") or p.get("email"),
+        "name": p.get("name"),
+    }
     profile = None
-    try:
-        r = requests.get(
-            KC_USERINFO, headers={"Authorization": f"Bearer {access_token}"}, timeout=10
-        )
-        profile = r.json() if r.status_code == 200 else None
-    except Exception:
-        profile = None
+    if claims_profile["sub"] and claims_profile["email"] and claims_profile["username"]:
+        profile = claims_profile
+    else:
+        try:
+            r = KC_HTTP.get(
+                KC_USERINFO, headers={"Authorization": f"Bearer {access_token}"}, timeout=10
+            )
+            profile = r.json() if r.status_code == 200 else None
+        except Exception:
+            profile = None
     if profile is None:
-        p = _jwt_payload_unverified(access_token)
-        profile = {
-            "sub": p.get("sub"),
-            "email": p.get("email"),
-            "username": p.get("preferred_username") or p.get("email"),
-            "name": p.get("name"),
-        }
+        profile = claims_profile
 
     now = int(time.time())
-    session["kc"] = {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "exp": now + int(tok_json.get("expires_in", 300)),
-        "refresh_exp": now + int(tok_json.get("refresh_expires_in", 1800)),
-        "profile": profile,
-    }
-    session["user"] = profile.get("email") or profile.get("username") or profile.get("sub")
+    # one write through the session interface for both keys
+    session.update(
+        kc={
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "exp": now + int(tok_json.get("expires_in", 300)),
+            "refresh_exp": now + int(tok_json.get("refresh_expires_in", 1800)),
+            "profile": profile,
+        },
+        user=profile.get("email") or profile.get("username") or profile.get("sub"),
+    )
     session.permanent = True
 
 
@@ -63,13 +83,12 @@ def refresh_tokens_if_needed():
     if now < kc.get("exp", 0) - 60:
         return
     data = {
+        **KC_CLIENT_CRED,
         "grant_type": "refresh_token",
-        "client_id": settings.KC_CLIENT_ID,
-        "client_secret": settings.KC_CLIENT_SECRET,
         "refresh_token": kc.get("refresh_token"),
     }
     try:
-        r = requests.post(KC_TOKEN, data=data, timeout=15)
+        r = KC_HTTP.post(KC_TOKEN, data=data, timeout=15)
         if r.status_code == 200:
             create_session_from_tokens(r.json())
         else:
@@ -78,7 +97,13 @@ def refresh_tokens_if_needed():
         session.pop("kc", None)
 
 
+_REFRESH_SKIP_ENDPOINTS = frozenset(
+    ("static", "auth.sso_password_login", "auth.login", "auth.logout")
+)
+
+
 def before_request_refresh():
-    if request.endpoint in ("static", "auth.sso_password_login", "auth.login", "auth.logout"):
+    # anonymous traffic (no Keycloak tokens in the session) has nothing to refresh
+    if "kc" not in session or request.endpoint in _REFRESH_SKIP_ENDPOINTS:
         return
     refresh_tokens_if_needed()
@@ -1,7 +1,11 @@
 # echorepo/config.py
 import os
+from dataclasses import dataclass
 
 
+# Read once from the environment at import; frozen + slots makes the many
+# `settings.X` reads on the request path plain slot accesses.
+@dataclass(frozen=True, slots=True)
 class Settings:
     # -------- Data locations --------
     INPUT_CSV: str = os.getenv("INPUT_CSV", "/data/echorepo_samples.csv")
@@ -9,15 +13,15 @@ class Settings:
     TABLE_NAME: str = os.getenv("TABLE_NAME", "samples")
     USERS_CSV: str = os.getenv("USERS_CSV", "/data/users.csv")
     USER_KEY_COLUMN: str = os.getenv("USER_KEY_COLUMN", "email")
-    API_KEY = os.environ.get("API_KEY")  # if set, required for access
-    SAMPLE_TABLE = os.environ.get("SAMPLE_TABLE")  # optional override
+    API_KEY: str | None = os.environ.get("API_KEY")  # if set, required for access
+    SAMPLE_TABLE: str | None = os.environ.get("SAMPLE_TABLE")  # optional override
 
     # Planned countries (xlsx with QR->countries)
     PLANNED_XLSX: str = os.getenv("PLANNED_XLSX", "/data/planned.xlsx")
 
     # -------- App secret & cookies --------
     SECRET_KEY: str = os.getenv("SECRET_KEY", "please-change-me")
-    SESSION_COOKIE_NAME = "echorepo_session"
+    SESSION_COOKIE_NAME: str = "echorepo_session"
     SESSION_COOKIE_SAMESITE: str = os.getenv("SESSION_COOKIE_SAMESITE", "Lax")
     SESSION_COOKIE_SECURE: bool = os.getenv("SESSION_COOKIE_SECURE", "true").lower() in (
         "1",
@@ -30,14 +34,11 @@ class Settings:
     JITTER_SALT: str = os.getenv("JITTER_SALT", "change-this-salt")
 
     # -------- Column names (preferred) --------
-    LAT_COL = os.getenv("LAT_COL", "lat")
-    LON_COL = os.getenv("LON_COL", "lon")
-    ORIG_LAT_COL = os.getenv("ORIG_LAT_COL", "GPS_lat")
-    ORIG_LON_COL = os.getenv("ORIG_LON_COL", "GPS_long")
-
-    # Your sentinel defaults (already present)
-    DEFAULT_COORD_LAT = float(os.getenv("DEFAULT_LAT", "46.5"))
-    DEFAULT_COORD_LON = float(os.getenv("DEFAULT_LON", "11.35"))
+    LAT_COL: str = os.getenv("LAT_COL", "lat")
+    LON_COL: str = os.getenv("LON_COL", "lon")
+    ORIG_LAT_COL: str = os.getenv("ORIG_LAT_COL", "GPS_lat")
+    ORIG_LON_COL: str = os.getenv("ORIG_LON_COL", "GPS_long")
+
     # LAT_COL: str = os.getenv("LAT_COL", "GPS_lat")
     # LON_COL: str = os.getenv("LON_COL", "GPS_long")
 
@@ -52,9 +53,9 @@ class Settings:
 
     ORIG_COL_SUFFIX: str = os.getenv("ORIG_COL_SUFFIX", "_orig")
     HIDE_ORIG_COLS: bool = os.getenv("HIDE_ORIG_COLS", "true").lower() in ("1", "true", "yes")
-    HIDE_ORIG_LIST: list[str] = [
+    HIDE_ORIG_LIST: tuple[str, ...] = tuple(
         c.strip() for c in os.getenv("HIDE_ORIG_LIST", "").split(",") if c.strip()
-    ]
+    )
 
     # -------- Keycloak / OIDC --------
     KC_BASE: str = os.getenv("KEYCLOAK_BASE_URL", "https://keycloak-dev.quanta-labs.com").rstrip(
@@ -76,12 +77,12 @@ class Settings:
     FIREBASE_WEB_API_KEY: str | None = os.getenv("FIREBASE_WEB_API_KEY") or None
 
     # -------- i18n / Babel --------
-    BABEL_TRANSLATION_DIRECTORIES = "/app/translations"  # compiled .mo files location
+    BABEL_TRANSLATION_DIRECTORIES: str = "/app/translations"  # compiled .mo files location
 
     # -------- Misc --------
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     SURVEY_BASE_URL: str = os.getenv("SURVEY_BASE_URL", "https://www.soscisurvey.de/default?r=")
-    LAB_UPLOAD_ALLOWLIST_PATH = os.getenv(
+    LAB_UPLOAD_ALLOWLIST_PATH: str = os.getenv(
         "LAB_UPLOAD_ALLOWLIST_PATH", "/data/config/lab_upload_allowlist.csv"
     )
 
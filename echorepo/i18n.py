@@ -1,13 +1,12 @@
 # echorepo/i18n.py
 import os
 
-from flask import Blueprint, current_app, redirect, request, url_for
+from flask import Blueprint, current_app, g, redirect, request, url_for
 from flask_babel import Babel, get_locale
-from flask_babel import gettext as _real_gettext
-
-from .services.i18n_overrides import get_overrides
 
 SUPPORTED_LOCALES = ["en", "cs", "nl", "fi", "fr", "de", "el", "it", "pl", "pt", "ro", "sk", "es"]
+# O(1) membership checks; the list keeps its order for best_match and templates
+_SUPPORTED = frozenset(SUPPORTED_LOCALES)
 
 # Raw English msgids used for JS labels
 BASE_LABEL_MSGIDS = {
@@ -51,6 +50,9 @@ BASE_LABEL_MSGIDS = {
     "elementalConcentrationsHelp": "Percentage values (%) can be converted to mg/kg by multiplying by 10000.",
 }
 
+# Same entries as (key, msgid) pairs, for the hot label-building loops
+BASE_LABEL_PAIRS: tuple[tuple[str, str], ...] = tuple(BASE_LABEL_MSGIDS.items())
+
 LOCALE_FLAGS = {
     "en": "gb",
     "cs": "cz",
@@ -70,41 +72,29 @@ LOCALE_FLAGS = {
 babel = Babel()
 
 
-def base_labels() -> dict:
-    # Translate the raw English msgids for the current locale
-    return {k: _real_gettext(v) for k, v in BASE_LABEL_MSGIDS.items()}
+def _select_locale():
+    # The locale cannot change mid-request: resolve it once, then reuse from g
+    loc = g.get("_locale")
+    if loc is None:
+        g._locale = loc = _select_locale_uncached()
+    return loc
 
 
-def _select_locale():
+def _select_locale_uncached():
     # 1) cookie (persistent, survives logout)
     c = request.cookies.get("locale")
-    if c in SUPPORTED_LOCALES:
+    if c in _SUPPORTED:
         return c
 
     # 2) explicit URL param
     q = request.args.get("lang")
-    if q in SUPPORTED_LOCALES:
+    if q in _SUPPORTED:
         return q
 
     # 3) Accept-Language
     return request.accept_languages.best_match(SUPPORTED_LOCALES) or "en"
 
 
-def build_i18n_labels(base: dict) -> dict:
-    """
-    base: dict of key -> already-translated strings (via _())
-    """
-    try:
-        locale = str(get_locale() or "en")
-    except Exception:
-        locale = "en"
-
-    overrides = get_overrides(locale)
-    out = dict(base)
-    out.update(overrides)
-    return out
-
-
 def init_i18n(app):
     app.config.setdefault("BABEL_DEFAULT_LOCALE", "en")
     app.config["BABEL_TRANSLATION_DIRECTORIES"] = os.path.join(app.root_path, "translations")
@@ -113,19 +103,24 @@ def init_i18n(app):
 
     @app.context_processor
     def inject_i18n():
-        base = base_labels()
-        labels = build_i18n_labels(base)
+        # Cached per (locale, overrides version); imported here because
+        # services.i18n_labels itself imports this module
+        from .services.i18n_labels import make_labels
 
         try:
-            current_app.logger.warning(
-                "inject_i18n: locale=%s cookie.locale=%r labels_count=%s keys_sample=%s",
-                str(get_locale() or "NONE"),
+            locale = str(get_locale() or "en")
+        except Exception:
+            locale = "en"
+        labels = make_labels(locale)
+
+        # debug aid only; this runs on every template render
+        if current_app.debug:
+            current_app.logger.debug(
+                "inject_i18n: locale=%s cookie.locale=%r labels_count=%s",
+                locale,
                 request.cookies.get("locale"),
                 len(labels),
-                list(labels.keys())[:5],
             )
-        except Exception as e:
-            current_app.logger.warning("inject_i18n log failed: %s", e)
 
         return {"I18N": {"labels": labels, "by_msgid": {}}}
 
@@ -136,9 +131,11 @@ lang_bp = Blueprint("lang", __name__, url_prefix="/lang")
 
 @lang_bp.route("/<lang_code>")
 def set_language(lang_code):
-    if lang_code not in SUPPORTED_LOCALES:
+    if lang_code not in _SUPPORTED:
         lang_code = "en"
 
     resp = redirect(request.referrer or url_for("web.explore"))
-    resp.set_cookie("locale", lang_code, max_age=60 * 60 * 24 * 730, samesite="Lax")
+    # no Set-Cookie when the visitor re-selects the language they already have
+    if request.cookies.get("locale") != lang_code:
+        resp.set_cookie("locale", lang_code, max_age=60 * 60 * 24 * 730, samesite="Lax")
     return resp
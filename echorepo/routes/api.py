@@ -1,11 +1,9 @@
 # echorepo/routes/api.py
-from io import BytesIO
-
-from flask import Blueprint, abort, jsonify, request, send_file, session
+from flask import Blueprint, abort, jsonify, session
 
 from ..auth.decorators import login_required
 from ..config import settings
-from ..services.db import get_pg_conn, query_others_df, query_sample_df, query_user_df
+from ..services.db import get_pg_conn, query_others_df, query_user_df
 from ..utils.geo import df_to_geojson, pick_lat_lon_cols
 
 api_bp = Blueprint("api", __name__)
@@ -188,13 +186,10 @@ def user_geojson_debug():
 
     if df is not None and not df.empty and lat_col and lon_col:
         try:
-            feats = sum(
-                1
-                for _, r in df.iterrows()
-                if r.get(lat_col) not in (None, "")
-                and r.get(lon_col) not in (None, "")
-            )
-            info["feature_count_if_converted"] = feats
+            # column-wise mask instead of boxing every row into a Series
+            lat, lon = df[lat_col], df[lon_col]
+            has_coords = lat.notna() & lat.ne("") & lon.notna() & lon.ne("")
+            info["feature_count_if_converted"] = int(has_coords.sum())
         except Exception:
             pass
 
@@ -220,40 +215,3 @@ def others_geojson():
             f["properties"].pop("userId", None)
 
     return jsonify(gj)
-    
-
-@api_bp.get("/download/sample_csv")
-@login_required
-def download_sample_csv():
-    sample_id = (request.args.get("sampleId") or "").strip()
-    if not sample_id:
-        abort(400, description="sampleId is required")
-
-    df = query_sample_df(sample_id)
-    if df.empty:
-        abort(404, description="Sample not found")
-
-    user_key = session.get("user")
-    is_owner = False
-
-    try:
-        if "email" in df.columns and (df["email"] == user_key).any():
-            is_owner = True
-        if "userId" in df.columns and (df["userId"] == user_key).any():
-            is_owner = True
-    except Exception:
-        pass
-
-    if not is_owner:
-        df = df.drop(columns=["email", "userId"], errors="ignore")
-
-    buf = BytesIO()
-    df.to_csv(buf, index=False)
-    buf.seek(0)
-
-    return send_file(
-        buf,
-        as_attachment=True,
-        download_name=f"sample_{sample_id}.csv",
-        mimetype="text/csv",
-    )
\ No newline at end of file
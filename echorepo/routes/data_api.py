@@ -2,22 +2,37 @@
 from __future__ import annotations
 
 import csv
+import hashlib
+import hmac
 import io
 import json
 import math
 import os
 import re
 import sqlite3
+import threading
 import time
 import zipfile
+from collections.abc import Iterable
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain, islice
+from types import MappingProxyType
 from typing import Any
 
 import jwt  # pip install PyJWT
-import requests  # pip install requests
-from flask import Blueprint, Response, abort, current_app, g, jsonify, request
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    g,
+    jsonify,
+    request,
+)
 from psycopg2.extras import RealDictCursor
 
+from echorepo.auth.keycloak import KC_HTTP
 from echorepo.routes.storage import _get_minio_client
 from echorepo.services.db import get_pg_conn
 
@@ -113,6 +128,38 @@ def quote_ident(name: str) -> str:
     return '"' + name.replace('"', '""') + '"'
 
 
+# (db path, table) -> (db file mtime, column names). The schema only changes
+# when the database file is rebuilt, so PRAGMA table_info runs once per file.
+_TABLE_COLS: dict[tuple[str, str], tuple[int, frozenset[str]]] = {}
+# (db path, table) -> (db file mtime, unfiltered row count) for /samples/count
+_TOTAL_COUNT: dict[tuple[str, str], tuple[int, int]] = {}
+
+
+def _db_mtime(path: str) -> int:
+    # newest of the db file and its WAL: in WAL mode commits land in -wal
+    # first and only reach the main file at checkpoint
+    mtime = 0
+    for p in (path, path + "-wal"):
+        try:
+            mtime = max(mtime, os.stat(p).st_mtime_ns)
+        except OSError:
+            pass
+    return mtime
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> frozenset[str]:
+    """Column names of `table`, cached until the SQLite file changes."""
+    key = (get_db_path(), table)
+    mtime = _db_mtime(key[0])
+    hit = _TABLE_COLS.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    cur = conn.execute(f"PRAGMA table_info({quote_ident(table)})")
+    cols = frozenset(row[1] for row in cur.fetchall())
+    _TABLE_COLS[key] = (mtime, cols)
+    return cols
+
+
 def get_sample_table(conn: sqlite3.Connection) -> str:
     """
     Find the samples table. Use SAMPLE_TABLE if provided; else pick common names
@@ -122,6 +169,21 @@ def get_sample_table(conn: sqlite3.Connection) -> str:
     if explicit:
         return explicit
 
+    path = get_db_path()
+    mtime = _db_mtime(path)
+    hit = _SAMPLE_TABLE_CACHE.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    table = _discover_sample_table(conn)
+    _SAMPLE_TABLE_CACHE[path] = (mtime, table)
+    return table
+
+
+# db path -> (db file mtime, discovered samples table)
+_SAMPLE_TABLE_CACHE: dict[str, tuple[int, str]] = {}
+
+
+def _discover_sample_table(conn: sqlite3.Connection) -> str:
     cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
     tables = [r[0] for r in cur.fetchall()]
 
@@ -131,9 +193,7 @@ def get_sample_table(conn: sqlite3.Connection) -> str:
 
     for t in tables:
         try:
-            c = conn.execute(f"PRAGMA table_info({quote_ident(t)})")
-            cols = {row[1] for row in c.fetchall()}
-            if "sampleId" in cols:
+            if "sampleId" in table_columns(conn, t):
                 return t
         except Exception:
             continue
@@ -148,32 +208,87 @@ def get_sample_table(conn: sqlite3.Connection) -> str:
 # -----------------------------------------------------------------------------
 
 
+def _signing_keys(jwks: dict) -> dict:
+    """kid -> verification key. PyJWK picks the key type (RSA/EC) from the JWK
+    itself; keys this PyJWT build can't load are skipped, not fatal."""
+    keys = {}
+    for k in jwks.get("keys", []):
+        if not k.get("kid"):
+            continue
+        try:
+            keys[k["kid"]] = jwt.PyJWK(k).key
+        except jwt.PyJWTError:
+            continue
+    return keys
+
+
+# Process-wide OIDC config per issuer URL; g would only keep it for a single
+# request. Keyed by issuer so apps with different OIDC_ISSUER_URLs in one
+# process don't share keys.
+_OIDC_CFG: dict[str | None, dict[str, Any]] = {}
+_OIDC_LOCK = threading.Lock()
+
+
 def oidc_cfg():
-    """Cache OIDC well-known + JWKS for 5 minutes."""
-    cfg = getattr(g, "_oidc_cfg", None)
+    """Cache OIDC well-known + JWKS (and the parsed signing keys) for 5 minutes."""
+    issuer = current_app.config.get("OIDC_ISSUER_URL") or os.environ.get("OIDC_ISSUER_URL")
+    cfg = _OIDC_CFG.get(issuer)
     if cfg and cfg["exp"] > time.time():
         return cfg
 
-    issuer = current_app.config.get("OIDC_ISSUER_URL") or os.environ.get("OIDC_ISSUER_URL")
-    if not issuer:
-        g._oidc_cfg = {"exp": time.time() + 300, "enabled": False}
-        return g._oidc_cfg
-
-    well = requests.get(issuer.rstrip("/") + "/.well-known/openid-configuration", timeout=5).json()
-    jwks = requests.get(well["jwks_uri"], timeout=5).json()
-    g._oidc_cfg = {
-        "enabled": True,
-        "issuer": well["issuer"],
-        "jwks": jwks,
-        "aud": current_app.config.get("OIDC_AUDIENCE") or os.environ.get("OIDC_AUDIENCE"),
-        "client_id": current_app.config.get("OIDC_CLIENT_ID") or os.environ.get("OIDC_CLIENT_ID"),
-        "exp": time.time() + 300,
-    }
-    return g._oidc_cfg
+    with _OIDC_LOCK:
+        cfg = _OIDC_CFG.get(issuer)
+        if cfg and cfg["exp"] > time.time():
+            return cfg  # another thread refreshed it meanwhile
+
+        if not issuer:
+            cfg = {"exp": time.time() + 300, "enabled": False}
+        else:
+            # the issuer is our Keycloak: reuse its pooled keep-alive session
+            well = KC_HTTP.get(
+                issuer.rstrip("/") + "/.well-known/openid-configuration", timeout=5
+            ).json()
+            jwks = KC_HTTP.get(well["jwks_uri"], timeout=5).json()
+            cfg = {
+                "enabled": True,
+                "issuer": well["issuer"],
+                "jwks": jwks,
+                "keys": _signing_keys(jwks),
+                "aud": current_app.config.get("OIDC_AUDIENCE") or os.environ.get("OIDC_AUDIENCE"),
+                "client_id": current_app.config.get("OIDC_CLIENT_ID")
+                or os.environ.get("OIDC_CLIENT_ID"),
+                "exp": time.time() + 300,
+            }
+        _OIDC_CFG[issuer] = cfg  # readers see the old or the new dict, never a partial one
+        return cfg
+
+
+# Tokens that already passed verify_bearer(), so a client reusing its bearer
+# skips the signature check: blake2b(issuer, token) -> (expiry, claims).
+# Entries never outlive the token's own exp; failures are never cached.
+_VERIFIED: dict[bytes, tuple[float, MappingProxyType]] = {}
+_VERIFIED_LOCK = threading.Lock()
+_VERIFIED_MAX = 4096
+_VERIFIED_TTL = 3600  # seconds, upper bound for long-lived tokens
+
+
+def _remember_verified(digest: bytes, claims: dict, now: float) -> MappingProxyType:
+    frozen = MappingProxyType(claims)
+    with _VERIFIED_LOCK:
+        if len(_VERIFIED) >= _VERIFIED_MAX:
+            for k in [k for k, (exp, _) in _VERIFIED.items() if exp <= now]:
+                del _VERIFIED[k]
+            if len(_VERIFIED) >= _VERIFIED_MAX:
+                _VERIFIED.clear()
+        _VERIFIED[digest] = (min(float(claims["exp"]), now + _VERIFIED_TTL), frozen)
+    return frozen
 
 
 def verify_bearer():
-    """Return decoded claims if Authorization: Bearer <JWT> is valid; else None."""
+    """
+    Return decoded claims (read-only) if Authorization: Bearer <JWT> is valid;
+    else None.
+    """
     auth = request.headers.get("Authorization", "")
     if not auth.startswith("Bearer "):
         return None
@@ -181,15 +296,17 @@ def verify_bearer():
     cfg = oidc_cfg()
     if not cfg.get("enabled"):
         return None
+
+    now = time.time()
+    digest = hashlib.blake2b(f"{cfg['issuer']}\0{token}".encode(), digest_size=16).digest()
+    hit = _VERIFIED.get(digest)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
     try:
         # pick key by kid
-        keys = {
-            k.get("kid"): jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(k))
-            for k in cfg["jwks"]["keys"]
-            if k.get("kid")
-        }
         header = jwt.get_unverified_header(token)
-        key = keys.get(header.get("kid"))
+        key = cfg["keys"].get(header.get("kid"))
         if not key:
             return None
 
@@ -216,7 +333,7 @@ def verify_bearer():
             if not aud and claims.get("azp") != client_id and client_id not in aud_set:
                 return None
 
-        return claims
+        return _remember_verified(digest, claims, now)
     except Exception:
         return None
 
@@ -244,21 +361,64 @@ def _close_conn(exc):
         conn.close()
 
 
+def streamed_from_conn(conn: sqlite3.Connection, build) -> Response:
+    """
+    Return build()'s streamed Response with the per-request connection handed
+    over to it. Teardown runs before a streamed body is sent, so the
+    connection is taken off g and closed when the response is closed instead.
+    """
+    if g.get("sqlite_conn") is conn:
+        g.pop("sqlite_conn")
+    try:
+        resp = build()
+    except BaseException:
+        conn.close()
+        raise
+    resp.call_on_close(conn.close)
+    return resp
+
+
 # -----------------------------------------------------------------------------
 # Parsing & helpers
 # -----------------------------------------------------------------------------
 
 
+# The loose forms strptime accepted for "%Y-%m-%d[THH:MM[:SS[.ffffff]]]"
+# (1-2 digit fields, 1-6 digit fraction), matched without strptime's
+# per-call format parsing and locale lookups.
+_ISO_RE = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2})(?:T(\d{1,2}):(\d{1,2})(?::(\d{1,2})(?:\.(\d{1,6}))?)?)?"
+)
+
+
 def parse_iso8601(s: str) -> str | None:
     if not s:
         return None
     s = s.strip()
-    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f"):
+    # fast path: fromisoformat (C) handles the canonical forms
+    try:
+        dt = datetime.fromisoformat(s)
+        if dt.tzinfo is None:
+            return dt.isoformat()
+        return s  # offset-aware input is passed through as before
+    except ValueError:
+        pass
+    m = _ISO_RE.fullmatch(s)
+    if m:
+        y, mo, d, h, mi, sec, frac = m.groups()
         try:
-            dt = datetime.strptime(s, fmt)
+            dt = datetime(
+                int(y),
+                int(mo),
+                int(d),
+                int(h or 0),
+                int(mi or 0),
+                int(sec or 0),
+                int(frac.ljust(6, "0")) if frac else 0,
+            )
             return dt.isoformat()
         except ValueError:
-            continue
+            pass
     return s  # fallback—SQLite can still compare ISO-like strings
 
 
@@ -331,10 +491,11 @@ def _is_oxide_field(name: str) -> bool:
     return _looks_like_oxide(last)
 
 
+# Pure function of the column name, and the set of names is small (the table
+# schema), so the oxide regex work runs once per name rather than per request.
+@lru_cache(maxsize=1024)
 def is_excluded_field(name: str) -> bool:
-    if name in PII_FIELDS:
-        return True
-    if any(name.endswith(suf) for suf in EXCLUDED_SUFFIXES):
+    if name in PII_FIELDS or name.endswith(EXCLUDED_SUFFIXES):
         return True
     return _is_oxide_field(name)
 
@@ -356,6 +517,21 @@ DEFAULT_FIELDS = [
 # -----------------------------------------------------------------------------
 
 
+def _required_api_key() -> bytes:
+    """
+    API_KEY (app config, else environment) as bytes, memoized on the app on
+    first use. Re-resolved whenever the configured value changes, so setting
+    API_KEY after the blueprint is registered still takes effect.
+    """
+    cfg_key = current_app.config.get("API_KEY")
+    memo = current_app.extensions.get("data_api_key")
+    if memo is None or memo[0] != cfg_key:
+        raw = cfg_key or os.environ.get("API_KEY") or ""
+        memo = (cfg_key, raw.strip().encode())
+        current_app.extensions["data_api_key"] = memo
+    return memo[1]
+
+
 def require_api_auth():
     """
     Allow one of:
@@ -363,18 +539,17 @@ def require_api_auth():
       - Authorization: Bearer <JWT> (Keycloak)
       - Logged-in Flask session (flask-login)
     """
-    required = (current_app.config.get("API_KEY") or os.environ.get("API_KEY") or "").strip()
+    required = _required_api_key()
     if required:
         authz = request.headers.get("Authorization", "")
         given = (
-            request.headers.get("X-API-Key")
-            or request.headers.get("X-Api-Key")
-            or request.headers.get("x-api-key")
+            request.headers.get("X-API-Key")  # header lookup is case-insensitive
             or request.args.get("api_key")
             or (authz.startswith("ApiKey ") and authz[7:])
             or ""
         )
-        if given.strip() == required:
+        # constant-time compare; bytes so non-ASCII input can't raise
+        if hmac.compare_digest(given.strip().encode("utf-8"), required):
             return
 
     if verify_bearer():
@@ -396,41 +571,89 @@ def require_api_auth():
 # -----------------------------------------------------------------------------
 
 
-def to_geojson(rows: list[sqlite3.Row], lon_col: str, lat_col: str) -> Response:
+def to_geojson(rows: Iterable[sqlite3.Row], lon_col: str, lat_col: str) -> Response:
+    # Rows are sqlite3.Row or psycopg2 RealDictRow; both index by column name.
+    # Resolve the property columns once instead of copying/filtering each row.
+    # rows may be a live cursor: it is iterated once, never materialized.
     feats = []
-    for r in rows:
-        d = dict(r)
-        try:
-            lon = float(d.get(lon_col))
-            lat = float(d.get(lat_col))
-        except Exception:
-            lon = lat = None
-        if lon is None or lat is None:
-            continue
-        props = {k: v for k, v in d.items() if k not in (lon_col, lat_col)}
-        feats.append(
-            {
-                "type": "Feature",
-                "geometry": {"type": "Point", "coordinates": [lon, lat]},
-                "properties": props,
-            }
-        )
+    rows = iter(rows)
+    first = next(rows, None)
+    names = list(first.keys()) if first is not None else []
+    if lon_col in names and lat_col in names:
+        prop_names = [n for n in names if n != lon_col and n != lat_col]
+        for r in chain((first,), rows):
+            try:
+                lon = float(r[lon_col])
+                lat = float(r[lat_col])
+            except Exception:
+                continue
+            feats.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": {n: r[n] for n in prop_names},
+                }
+            )
     return jsonify({"type": "FeatureCollection", "features": feats})
 
 
+_STREAM_BATCH_ROWS = 500  # rows per yielded chunk
+
+
+def stream_json(rows_iter, meta: dict) -> Response:
+    """
+    Stream {"data": [...], "meta": {...}} a batch of rows at a time (same
+    sorted-key layout jsonify produces).
+    """
+    dumps = current_app.json.dumps
+    # rows_iter may be a live cursor (see streamed_from_conn). The first batch
+    # is read here, so a failing query errors out of the view with a proper
+    # status instead of cutting a 200 body short.
+    rows = iter(rows_iter)
+    first = list(islice(rows, _STREAM_BATCH_ROWS))
+
+    def generate():
+        yield '{"data":['
+        batch, sent = first, False
+        while batch:
+            chunk = ",".join(dumps(dict(r), separators=(",", ":")) for r in batch)
+            yield ("," if sent else "") + chunk
+            sent = True
+            batch = list(islice(rows, _STREAM_BATCH_ROWS))
+        yield '],"meta":' + dumps(meta, separators=(",", ":")) + "}\n"
+
+    return Response(generate(), mimetype="application/json")
+
+
 def stream_csv(rows_iter, fields: list[str]) -> Response:
+    # rows_iter may be a live cursor; its connection must outlive the request
+    # (see streamed_from_conn)
     def generate():
         output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=fields, extrasaction="ignore")
-        writer.writeheader()
-        yield output.getvalue()
-        output.seek(0)
-        output.truncate(0)
-        for r in rows_iter:
-            writer.writerow(dict(r))
+        writer = csv.writer(output)
+        writer.writerow(fields)  # goes out with the first batch
+        rows = iter(rows_iter)
+        first = next(rows, None)
+        if first is not None:
+            # plain csv.writer over the field values; no per-row dict copy
+            if isinstance(first, dict):
+                # psycopg2 RealDictRow: missing keys become "" (DictWriter's restval)
+                def values(r):
+                    return [r.get(f, "") for f in fields]
+
+            else:
+                # sqlite3.Row of the SELECTed fields: index by name in C
+                def values(r):
+                    return [r[f] for f in fields]
+
+            rows = chain((first,), rows)
+            while batch := list(islice(rows, _STREAM_BATCH_ROWS)):
+                writer.writerows(map(values, batch))
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+        if output.tell():  # no rows: header only
             yield output.getvalue()
-            output.seek(0)
-            output.truncate(0)
 
     return Response(generate(), mimetype="text/csv")
 
@@ -647,8 +870,9 @@ def samples():
 
     # ---------- Fields (requested → sanitized → excluded stripped) ----------
     fields_param = request.args.get("fields", "")
+    # strip once and drop duplicates, keeping the requested order
     requested_fields = (
-        [f.strip() for f in fields_param.split(",") if f.strip()]
+        list(dict.fromkeys(f for f in map(str.strip, fields_param.split(",")) if f))
         if fields_param
         else DEFAULT_FIELDS[:]
     )
@@ -656,27 +880,29 @@ def samples():
     conn = get_conn()
     table = get_sample_table(conn)
 
-    cur = conn.execute(f"PRAGMA table_info({quote_ident(table)})")
-    cols = {row[1] for row in cur.fetchall()}
+    cols = table_columns(conn, table)
+    # classify every column once; all later checks are set lookups
+    safe = frozenset(c for c in cols if not is_excluded_field(c))
+    safe_sorted = sorted(safe)
 
     if requested_fields == ["*"]:
-        requested_fields = sorted(c for c in cols if not is_excluded_field(c))
+        requested_fields = safe_sorted
 
-    fields = [f for f in requested_fields if f in cols and not is_excluded_field(f)]
+    fields = [f for f in requested_fields if f in safe]
     if not fields:
         # fallback: defaults that exist and are safe
         fields = [f for f in DEFAULT_FIELDS if f in cols]
         if not fields:
             # ultimate fallback: any non-excluded columns
-            fields = sorted(c for c in cols if not is_excluded_field(c))
+            fields = safe_sorted
 
     # ---------- Order (must not be excluded) ----------
     order = (request.args.get("order") or "collectedAt").strip()
-    if order not in cols or is_excluded_field(order):
+    if order not in safe:
         order = (
             "collectedAt"
-            if "collectedAt" in cols and not is_excluded_field("collectedAt")
-            else (next((c for c in cols if not is_excluded_field(c)), "rowid"))
+            if "collectedAt" in safe
+            else (safe_sorted[0] if safe_sorted else "rowid")
         )
     direction = (request.args.get("dir") or "desc").lower()
     direction = "desc" if direction not in ("asc", "desc") else direction
@@ -709,35 +935,41 @@ def samples():
     # ---------- Query ----------
     selected = ", ".join(quote_ident(f) for f in fields) if fields else "*"
     if selected == "*":
-        safe_all = sorted(c for c in cols if not is_excluded_field(c))
-        selected = ", ".join(quote_ident(f) for f in safe_all) if safe_all else "*"
+        selected = ", ".join(quote_ident(f) for f in safe_sorted) if safe_sorted else "*"
 
-    sql = f"SELECT {selected} FROM {quote_ident(table)} {where_sql} ORDER BY {quote_ident(order)} {direction} LIMIT ? OFFSET ?"
-    rows = list(conn.execute(sql, params + [limit, offset]).fetchall())
+    page_sql = f"{where_sql} ORDER BY {quote_ident(order)} {direction} LIMIT ? OFFSET ?"
+    page_params = params + [limit, offset]
+    sql = f"SELECT {selected} FROM {quote_ident(table)} {page_sql}"
+
+    if fmt == "csv":
+        # stream straight off the cursor; rows are never all in memory
+        return streamed_from_conn(conn, lambda: stream_csv(conn.execute(sql, page_params), fields))
+    if fmt == "geojson":
+        return to_geojson(conn.execute(sql, page_params), "GPS_long", "GPS_lat")
 
-    # count (best-effort)
+    # count (best-effort); a separate COUNT(*) rather than a COUNT(*) OVER ()
+    # window, which would make SQLite collect and sort every filtered row
+    # before the LIMITed page could start streaming
     try:
         cnt = conn.execute(
             f"SELECT COUNT(*) FROM {quote_ident(table)} {where_sql}", params
         ).fetchone()[0]
-    except Exception:
-        cnt = len(rows)
+    except Exception as e:
+        current_app.logger.warning(f"/samples count failed: {e}")
+        cnt = 0
 
-    if fmt == "csv":
-        return stream_csv(iter(rows), fields)
-    if fmt == "geojson":
-        return to_geojson(rows, "GPS_long", "GPS_lat")
-    return jsonify(
-        {
-            "meta": {
+    return streamed_from_conn(
+        conn,
+        lambda: stream_json(
+            conn.execute(sql, page_params),
+            {
                 "count": cnt,
                 "limit": limit,
                 "offset": offset,
                 "order": order,
                 "dir": direction,
             },
-            "data": [dict(r) for r in rows],
-        }
+        ),
     )
 
 
@@ -759,10 +991,20 @@ def samples_count():
         where.append(f"{quote_ident('collectedAt')} <= ?")
         params.append(to_s)
 
+    # the unfiltered total (the common call) only changes with the db file
+    if not where:
+        key = (get_db_path(), table)
+        mtime = _db_mtime(key[0])
+        hit = _TOTAL_COUNT.get(key)
+        if hit is not None and hit[0] == mtime:
+            return jsonify({"count": hit[1]})
+
     where_sql = ("WHERE " + " AND ".join(where)) if where else ""
     cnt = conn.execute(f"SELECT COUNT(*) FROM {quote_ident(table)} {where_sql}", params).fetchone()[
         0
     ]
+    if not where:
+        _TOTAL_COUNT[key] = (mtime, cnt)
     return jsonify({"count": cnt})
 
 
@@ -3,14 +3,14 @@ import json
 import os
 from pathlib import Path
 
-from babel.support import Translations
-from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request
+from flask import Blueprint, abort, current_app, jsonify, render_template, request
 from flask_babel import get_locale
 
 from echorepo.auth.decorators import login_required
 from echorepo.i18n import BASE_LABEL_MSGIDS
-from echorepo.services.i18n_labels import make_labels
+from echorepo.services.i18n_labels import _catalog_gettext
 from echorepo.services.i18n_overrides import (
+    _canon_locale,
     delete_override,
     delete_override_msgid,
     get_overrides,
@@ -25,33 +25,6 @@ bp = Blueprint("i18n_admin", __name__, url_prefix="/i18n")
 JS_MSGIDS = set(BASE_LABEL_MSGIDS.values())
 
 
-def _canon_locale(lang: str) -> str:
-    if not lang:
-        return "en"
-    lang = lang.strip().lower().replace("-", "_")
-    return lang.split("_", 1)[0]
-
-
-def _get_catalog(loc: str) -> Translations | None:
-    """Load compiled translations for a locale, or None."""
-    trans_dir = os.path.join(current_app.root_path, "translations")
-    try:
-        # returns NullTranslations if not found; .gettext(msgid) => msgid
-        return Translations.load(dirname=trans_dir, locales=[loc], domain="messages")
-    except Exception:
-        return None
-
-
-def _catalog_gettext(loc: str, msgid: str) -> str:
-    cat = _get_catalog(loc)
-    if cat:
-        try:
-            return cat.gettext(msgid)
-        except Exception:
-            pass
-    return msgid
-
-
 def _load_pot_entries():
     """Read msgids + references from messages.pot if available."""
     pot = os.path.join(current_app.root_path, "translations", "messages.pot")
@@ -117,17 +90,6 @@ def _save_manual_overrides(text_to_en: dict) -> None:
         json.dump(payload, f, ensure_ascii=False, indent=2)
 
 
-@bp.get("/labels.js")
-def labels_js():
-    loc_raw = request.args.get("locale") or str(get_locale() or "en")
-    loc = _canon_locale(loc_raw)
-    payload = {"labels": make_labels(loc)}
-    js = "window.I18N = " + json.dumps(payload, ensure_ascii=False) + ";"
-    resp = Response(js, mimetype="application/javascript; charset=utf-8")
-    resp.headers["Cache-Control"] = "no-store"
-    return resp
-
-
 @bp.get("/admin")
 @login_required
 def admin_page():
@@ -14,6 +14,7 @@ from pathlib import Path
 import pandas as pd
 from flask import (
     Blueprint,
+    Response,
     abort,
     g,
     jsonify,
@@ -26,7 +27,6 @@ from flask import (
 )
 from flask_babel import get_locale
 from flask_babel import gettext as _
-from openpyxl import load_workbook
 from psycopg2.extras import RealDictCursor
 
 from echorepo.services.i18n_labels import make_labels
@@ -1697,16 +1697,11 @@ def download_sample_csv():
     if not is_owner:
         row.pop("collected_by", None)
 
-    df = pd.DataFrame([row])
-
-    buf = BytesIO()
-
-    df.to_csv(
-        buf,
-        index=False,
-    )
-
-    buf.seek(0)
+    # One row: write it with csv directly instead of a DataFrame + BytesIO
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")  # same line endings as to_csv
+    writer.writerow(row.keys())
+    writer.writerow(row.values())
 
     safe_filename_id = re.sub(
         r"[^A-Za-z0-9._-]+",
@@ -1722,13 +1717,14 @@ def download_sample_csv():
         "sample_id": canonical_sample_id,
     }
 
-    return send_file(
-        buf,
-        as_attachment=True,
-        download_name=(
-            f"sample_{safe_filename_id}.csv"
-        ),
+    return Response(
+        buf.getvalue(),
         mimetype="text/csv",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="sample_{safe_filename_id}.csv"'
+            ),
+        },
     )
 
 
@@ -3283,6 +3279,8 @@ def _import_biodiversity_xlsx_bytes(xlsx_bytes: bytes, filename: str, uploader_i
 
 
 def _import_biodiversity_xlsx_streaming(xlsx_bytes: bytes, filename: str, uploader_id: str):
+    from openpyxl import load_workbook  # heavy; imported on first XLSX upload
+
     sample_pat = re.compile(r"^[A-Za-z0-9]{4}-[A-Za-z0-9]{4,}-(16S|ITS)$", re.IGNORECASE)
 
     try:
@@ -1,15 +1,18 @@
 import os
 from pathlib import Path
 
-import firebase_admin
 import requests
-from firebase_admin import credentials, firestore
 from flask_babel import gettext as _
 
 from ..config import settings
 
 
 def init_firebase_once():
+    # firebase_admin is heavy and only needed by the few views that write to
+    # Firestore, so it is imported on first use rather than at app start
+    import firebase_admin
+    from firebase_admin import credentials
+
     if firebase_admin._apps:
         return
     cred_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
@@ -24,6 +27,8 @@ def init_firebase_once():
 
 def update_coords_by_user_sample(user_id: str, sample_id: str, lat: float, lon: float):
     """Write to users/{userId}/samples/{sampleId}: data[1].info.lat/long"""
+    from firebase_admin import firestore
+
     init_firebase_once()
     db = firestore.client()
     ref = db.document(f"users/{user_id}/samples/{sample_id}")
@@ -2,23 +2,35 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
 from babel.support import Translations
 from flask import current_app
+from flask_babel import force_locale
+from flask_babel import gettext as _real_gettext
 
-from echorepo.i18n import BASE_LABEL_MSGIDS
-from echorepo.services.i18n_overrides import _canon_locale, get_overrides, get_overrides_msgid
+from echorepo.i18n import BASE_LABEL_PAIRS, SUPPORTED_LOCALES
+from echorepo.services.i18n_overrides import (
+    _canon_locale,
+    get_overrides,
+    get_overrides_msgid,
+    overrides_version,
+)
 
 
-def _get_catalog(loc: str) -> Translations | None:
-    """Load compiled translations for a locale, or None."""
-    trans_dir = os.path.join(current_app.root_path, "translations")
+@lru_cache(maxsize=64)
+def _load_catalog(trans_dir: str, loc: str) -> Translations | None:
     try:
         return Translations.load(dirname=trans_dir, locales=[loc], domain="messages")
     except Exception:
         return None
 
 
+def _get_catalog(loc: str) -> Translations | None:
+    """Load compiled translations for a locale (once per process), or None."""
+    return _load_catalog(os.path.join(current_app.root_path, "translations"), loc)
+
+
 def _catalog_gettext(loc: str, msgid: str) -> str:
     cat = _get_catalog(loc)
     if cat:
@@ -29,22 +41,53 @@ def _catalog_gettext(loc: str, msgid: str) -> str:
     return msgid
 
 
+_LABEL_LOCALES = frozenset(SUPPORTED_LOCALES)
+
+
+def resolve_label_locale(raw: str | None) -> str:
+    """
+    Canonical supported locale for `raw`, else "en". Babel raises on unknown
+    codes, and ?locale= is user input, so nothing else may reach the caches.
+    """
+    loc = _canon_locale(raw or "en")
+    return loc if loc in _LABEL_LOCALES else "en"
+
+
+def _build_labels_cached(loc: str, version: tuple) -> dict:
+    """Cached JS label dict for `loc` (unsupported codes fall back to "en")."""
+    return _build_labels(resolve_label_locale(loc), version)
+
+
+@lru_cache(maxsize=32)
+def _build_labels(loc: str, version: tuple) -> dict:
+    """
+    Build the JS label dict for a supported `loc`; the one copy shared by the
+    template context, /i18n/labels.{js,json} and make_labels().
+    Priority: key-override > msgid-override > gettext
+    `version` is only part of the cache key.
+    """
+    by_msgid_get = (get_overrides_msgid(loc) or {}).get
+    by_key_get = (get_overrides(loc) or {}).get
+    gettext = _real_gettext
+
+    labels = {}
+    with force_locale(loc):
+        for key, msgid in BASE_LABEL_PAIRS:
+            # prefer explicit key override for JS strings
+            text = by_key_get(key)
+            if text is None or text == "":
+                text = by_msgid_get(msgid) or gettext(msgid)
+            labels[key] = text
+    return labels
+
+
 def make_labels(locale_code: str) -> dict:
     """
-    Build JS labels payload (BASE_LABEL_MSGIDS) for /labels.js and /labels.json.
+    JS labels payload (BASE_LABEL_MSGIDS) for a locale.
     Merges:
       1) Babel catalog translations (messages.mo)
       2) msgid overrides
       3) key overrides (wins)
+    Cached per (locale, overrides version); treat the result as read-only.
     """
-    loc = _canon_locale(locale_code)
-    by_msgid = get_overrides_msgid(loc) or {}
-    by_key = get_overrides(loc) or {}
-
-    labels: dict[str, str] = {}
-    for key, msgid in BASE_LABEL_MSGIDS.items():
-        text = _catalog_gettext(loc, msgid)
-        text = by_msgid.get(msgid, text)
-        text = by_key.get(key, text)
-        labels[key] = text
-    return labels
+    return _build_labels(resolve_label_locale(locale_code), overrides_version())
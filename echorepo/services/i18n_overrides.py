@@ -2,22 +2,56 @@
 import json
 import os
 import threading
+from functools import lru_cache
 
 _LOCK = threading.Lock()
 
 
-def _canon_locale(lang: str) -> str:
+_LOCALE_TRANS = str.maketrans({"-": "_"})
+
+
+@lru_cache(maxsize=256)
+def _canon_locale_slow(lang: str) -> str:
     if not lang:
         return "en"
-    lang = lang.strip().lower().replace("-", "_")
-    return lang.split("_", 1)[0]  # "es_es" → "es"
+    return lang.strip().lower().translate(_LOCALE_TRANS).partition("_")[0]  # "es_es" → "es"
+
+
+# Codes already in canonical form ("en", "es", ...). get_locale() nearly always
+# returns one of these, so a set probe settles most calls. Filled from results
+# (bounded, since ?locale= is user input).
+_CANON_SET: set[str] = set()
+
+
+def _canon_locale(lang: str) -> str:
+    if lang in _CANON_SET:
+        return lang
+    loc = _canon_locale_slow(lang)
+    if len(_CANON_SET) < 64 and _canon_locale_slow(loc) == loc:
+        _CANON_SET.add(loc)
+    return loc
 
 
 # One place on disk (must be RW). You mount ./data:/data so this works.
 _OVERRIDES_PATH = os.environ.get("I18N_OVERRIDES_PATH", "/data/i18n_overrides.json")
 
 
-def _load():
+# Parsed file, reused until the file's mtime changes
+_CACHE = {"mtime": None, "data": {}}
+
+# Bumped on every write from this process; together with the mtime it makes
+# a version token that changes even when the filesystem mtime is too coarse.
+_WRITES = [0]
+
+
+def _mtime() -> int:
+    try:
+        return os.stat(_OVERRIDES_PATH).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _read():
     try:
         with _LOCK:
             if os.path.exists(_OVERRIDES_PATH):
@@ -28,10 +62,35 @@ def _load():
     return {}
 
 
+def _load():
+    """
+    Shared parsed overrides; the same dicts are returned until the file changes.
+    Callers must not mutate the result (writers go through _read()).
+    """
+    mtime = _mtime()
+    if mtime != _CACHE["mtime"]:
+        data = _read()
+        _CACHE["data"] = data
+        _CACHE["mtime"] = mtime
+    return _CACHE["data"]
+
+
 def _save(obj):
     os.makedirs(os.path.dirname(_OVERRIDES_PATH), exist_ok=True)
     with _LOCK, open(_OVERRIDES_PATH, "w", encoding="utf-8") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
+    # force a reload even if the filesystem mtime did not move
+    _CACHE["mtime"] = None
+    _WRITES[0] += 1
+
+
+def overrides_version() -> tuple[int, int]:
+    """
+    Cheap change token for the overrides file: (mtime in ns or 0 if missing,
+    local write count). Callers use it as part of cache keys so that edits
+    invalidate derived data.
+    """
+    return _mtime(), _WRITES[0]
 
 
 def get_overrides(locale: str) -> dict:
@@ -45,7 +104,7 @@ def get_overrides_msgid(locale: str) -> dict:
 
 
 def set_override(locale: str, key: str, value: str):
-    data = _load()
+    data = _read()
     loc = _canon_locale(locale)
     data.setdefault(loc, {}).setdefault("by_key", {})
     data[loc]["by_key"][key] = value
@@ -53,7 +112,7 @@ def set_override(locale: str, key: str, value: str):
 
 
 def delete_override(locale: str, key: str):
-    data = _load()
+    data = _read()
     loc = _canon_locale(locale)
     if loc in data and "by_key" in data[loc] and key in data[loc]["by_key"]:
         del data[loc]["by_key"][key]
@@ -61,7 +120,7 @@ def delete_override(locale: str, key: str):
 
 
 def set_override_msgid(locale: str, msgid: str, value: str):
-    data = _load()
+    data = _read()
     loc = _canon_locale(locale)
     data.setdefault(loc, {}).setdefault("by_msgid", {})
     data[loc]["by_msgid"][msgid] = value
@@ -69,7 +128,7 @@ def set_override_msgid(locale: str, msgid: str, value: str):
 
 
 def delete_override_msgid(locale: str, msgid: str):
-    data = _load()
+    data = _read()
     loc = _canon_locale(locale)
     if loc in data and "by_msgid" in data[loc] and msgid in data[loc]["by_msgid"]:
         del data[loc]["by_msgid"][msgid]
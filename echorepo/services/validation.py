@@ -2,9 +2,6 @@
 
 import numpy as np
 import pandas as pd
-import shapefile
-from shapely.geometry import Point
-from shapely.geometry import shape as shp_shape
 
 from ..config import settings
 from .planned import load_qr_to_planned
@@ -18,6 +15,10 @@ def _load_country_shapes():
     if _COUNTRY_SHAPES is not None:
         return _COUNTRY_SHAPES
 
+    # pyshp/shapely are only needed once the country check actually runs
+    import shapefile
+    from shapely.geometry import shape as shp_shape
+
     shp_path = getattr(
         settings,
         "COUNTRY_SHP_PATH",
@@ -41,6 +42,8 @@ def _load_country_shapes():
 
 
 def _point_country(lat: float, lon: float) -> str | None:
+    from shapely.geometry import Point
+
     shapes = _load_country_shapes()
     pt = Point(lon, lat)
     for iso2, geom in shapes.items():
@@ -59,6 +62,8 @@ def _within_planned_country_tolerance(
     if not planned_set:
         return False
 
+    from shapely.geometry import Point
+
     shapes = _load_country_shapes()
     pt = Point(lon, lat)
     tol_deg = _km_to_deg_lat(km)
@@ -0,0 +1,24 @@
+# echorepo/utils/jsonfast.py
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj) -> bytes:
+    """
+    Compact UTF-8 JSON (non-ASCII kept as-is).
+    Uses orjson when installed, stdlib json otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str):
+    """Parse JSON from bytes or str; orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
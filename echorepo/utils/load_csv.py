@@ -332,6 +332,7 @@ def ensure_sqlite():
             f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_qr      ON {TABLE_NAME}(QR_qrCode);",
             f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_sample  ON {TABLE_NAME}(sampleId);",
             f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_date    ON {TABLE_NAME}(collectedAt);",
+            f"CREATE INDEX IF NOT EXISTS idx_{TABLE_NAME}_gps     ON {TABLE_NAME}(GPS_lat, GPS_long);",
         ]:
             try:
                 cur.execute(idx_sql)
@@ -0,0 +1,63 @@
+import csv
+import io
+import os
+import sqlite3
+
+import pytest
+
+# echorepo.utils.load_csv resolves these at import time
+os.environ.setdefault("PROJECT_ROOT", "/tmp")
+os.environ.setdefault("CSV_PATH", "echorepo_samples.csv")
+os.environ.setdefault("SQLITE_PATH", "echo.db")
+
+from flask import Flask  # noqa: E402
+
+from echorepo.routes.data_api import _STREAM_BATCH_ROWS, data_api  # noqa: E402
+
+N_ROWS = 2 * _STREAM_BATCH_ROWS + 7  # more than one batch, last one partial
+
+
+@pytest.fixture
+def client(tmp_path):
+    db = tmp_path / "data.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE samples (sampleId TEXT, collectedAt TEXT, GPS_lat REAL, GPS_long REAL)"
+    )
+    conn.executemany(
+        "INSERT INTO samples VALUES (?, ?, ?, ?)",
+        [
+            (f"S{i:05d}", f"2024-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z", 46.5, 11.35)
+            for i in range(N_ROWS)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    app = Flask(__name__)
+    app.config.update(SQLITE_PATH=str(db), API_KEY="k")
+    app.register_blueprint(data_api, url_prefix="/api/v1")
+    return app.test_client()
+
+
+def test_samples_csv_streams_every_row(client):
+    resp = client.get("/api/v1/samples?format=csv&limit=1000&api_key=k", buffered=True)
+    assert resp.status_code == 200
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows[0] == ["sampleId", "collectedAt", "GPS_long", "GPS_lat"]
+    assert len(rows) == 1 + 1000
+
+
+def test_samples_json_streams_every_row(client):
+    resp = client.get("/api/v1/samples?limit=1000&api_key=k", buffered=True)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert len(body["data"]) == 1000
+    assert body["data"][0]["sampleId"] == f"S{N_ROWS - 1:05d}"  # collectedAt desc
+    assert body["meta"]["count"] == N_ROWS
+
+    resp = client.get("/api/v1/samples?limit=2&api_key=k", buffered=True)
+    assert [r["sampleId"] for r in resp.get_json()["data"]] == [
+        f"S{N_ROWS - 1:05d}",
+        f"S{N_ROWS - 2:05d}",
+    ]